@@ -1,17 +1,22 @@
 # 强制打印日志
-print("加载 DoubanRank 插件模块 (v3.1.2)...")
+print("加载 DoubanRank 插件模块 (v3.2.0)...")
 
 import datetime
+import heapq
 import json
 import re
 import time
-import random
-from threading import Event, Thread
+from collections import deque, namedtuple
+from concurrent.futures import ThreadPoolExecutor, as_completed
+from functools import lru_cache
+from threading import Event, Lock, Thread
+from types import MappingProxyType
 from typing import Tuple, List, Dict, Any
 
 import pytz
-from apscheduler.schedulers.background import BackgroundScheduler
+import requests
 from apscheduler.triggers.cron import CronTrigger
+from requests.adapters import HTTPAdapter
 
 from app.chain.download import DownloadChain
 from app.chain.media import MediaChain
@@ -19,29 +24,110 @@ from app.chain.subscribe import SubscribeChain
 from app.core.config import settings
 from app.core.context import MediaInfo
 from app.core.metainfo import MetaInfo
+from app.db.subscribe_oper import SubscribeOper
 from app.log import logger
 from app.plugins import _PluginBase
+from app.schemas.types import MediaType, NotificationType
 from app.utils.http import RequestUtils
 
-# 兼容性导入
+# 可选依赖：orjson 解析更快，缺失时回退标准库
 try:
-    from app.schemas import MediaType, NotificationType
+    import orjson as _json
 except ImportError:
-    from app.schemas.types import MediaType, NotificationType
+    _json = json
+
+# 可选依赖：simdjson 按需读取字段，不展开整个文档
+# 解析器不可跨线程共用，并发抓取时加锁
+try:
+    import simdjson
+    _SIMD_PARSER = simdjson.Parser()
+except ImportError:
+    _SIMD_PARSER = None
+_SIMD_LOCK = Lock()
+
+# 可选依赖：selectolax 解析榜单页面，缺失时回退正则
+try:
+    from selectolax.lexbor import LexborHTMLParser as HTMLParser
+except ImportError:
+    HTMLParser = None
+
+# 榜单页面解析正则，模块加载时编译一次
+_RE_TOP250 = re.compile(r'class="hd">\s*<a href=".*?/subject/(\d+)/".*?<span class="title">([^<]+)</span>.*?<span class="rating_num"[^>]*>([\d\.]+)</span>', re.S)
+_RE_CHART = re.compile(r'<a class="nbg" href=".*?/subject/(\d+)/"\s*title="([^"]+)".*?<span class="rating_nums">([\d\.]+)</span>', re.S)
+_RE_YEAR = re.compile(r'\d{4}')
+_RE_SUBJECT = re.compile(r'/subject/(\d+)')
+
+# 豆瓣 ID 与 TMDB ID 的对应关系缓存 7 天
+_TMDB_ID_TTL = 7 * 24 * 3600
+
+# 榜单条目
+_RankItem = namedtuple('_RankItem', 'id title rate year')
+
+# 历史卡片中不随条目变化的属性，所有卡片共用
+_CARD_PROPS = {'class': 'mx-auto mb-2', 'width': '100%'}
+_CARD_CLOSE_PROPS = {'innerClass': 'absolute top-0 right-0'}
+_CARD_BODY_PROPS = {'class': 'd-flex justify-space-start flex-nowrap flex-row'}
+_CARD_POSTER_PROPS = {'height': 120, 'width': 80, 'aspect-ratio': '2/3', 'class': 'object-cover shadow ring-gray-500', 'cover': True}
+_CARD_TITLE_PROPS = {'class': 'ps-1 pe-5 break-words whitespace-break-spaces'}
+_CARD_TEXT_PROPS = {'class': 'pa-0 px-2'}
+
+
+@lru_cache(maxsize=1024)
+def _parse_ts(time_str: str) -> int:
+    """
+    兼容没有 ts 字段的旧记录，由时间字符串换算时间戳
+    """
+    try:
+        return int(datetime.datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S").timestamp())
+    except (TypeError, ValueError):
+        return 0
+
+@lru_cache(maxsize=32)
+def _compile_cron(expr: str) -> CronTrigger:
+    """
+    解析 cron 表达式，框架多次调用 get_service 时复用同一触发器
+    """
+    return CronTrigger.from_crontab(expr)
+
+
+class _RateLimiter:
+    """
+    滑动窗口限流：窗口内请求数未达上限时不等待
+    """
+
+    def __init__(self, limit: int, period: float):
+        self.limit = limit
+        self.period = period
+        self.calls = deque()
+        self.lock = Lock()
+
+    def acquire(self):
+        with self.lock:
+            now = time.monotonic()
+            while self.calls and now - self.calls[0] >= self.period:
+                self.calls.popleft()
+            if len(self.calls) >= self.limit:
+                time.sleep(self.period - (now - self.calls.popleft()))
+            self.calls.append(time.monotonic())
+
 
 class DoubanRank(_PluginBase):
     # 插件基本信息
     plugin_name = "豆瓣榜单订阅增强版（自用）"
     plugin_desc = "直接抓取豆瓣官网数据，支持电影/剧集/综艺分类订阅，支持多榜单、评分年份过滤及智能去重。"
     plugin_icon = "https://img3.doubanio.com/favicon.ico"
-    plugin_version = "3.1.2"
+    plugin_version = "3.2.0"
     plugin_author = "outxool"
     plugin_config_prefix = "doubanrank_"
     plugin_order = 6
     auth_level = 2
 
     _event = Event()
-    _scheduler = None
+    # 定时任务与立即运行共用，同一时间只允许一个刷新任务
+    _run_lock = Lock()
+    _session = None
+    # 识别时会请求豆瓣/TMDB，每 10 秒最多 5 次
+    _limiter = _RateLimiter(limit=5, period=10)
     
     # 运行时的链对象
     subscribechain: SubscribeChain = None
@@ -49,17 +135,17 @@ class DoubanRank(_PluginBase):
     mediachain: MediaChain = None
     
     # -----------------------
-    # 榜单定义
+    # 榜单定义（只读，所有实例共用）
     # -----------------------
     # 电影
-    _movie_ranks_conf = {
+    _movie_ranks_conf = MappingProxyType({
         'movie_hot': {'name': '热门电影', 'type': 'api', 'url': 'https://movie.douban.com/j/search_subjects?type=movie&tag=%E7%83%AD%E9%97%A8&sort=recommend&page_limit=50&page_start=0'},
         'movie_top250': {'name': '电影Top250', 'type': 'html', 'url': 'https://movie.douban.com/top250'},
         'movie_weekly': {'name': '一周口碑榜', 'type': 'html', 'url': 'https://movie.douban.com/chart'},
         'movie_new': {'name': '新片榜', 'type': 'html', 'url': 'https://movie.douban.com/chart'},
-    }
+    })
     # 电视剧 (含动画)
-    _tv_ranks_conf = {
+    _tv_ranks_conf = MappingProxyType({
         'tv_hot': {'name': '热门电视剧(综合)', 'type': 'api', 'url': 'https://movie.douban.com/j/search_subjects?type=tv&tag=%E7%83%AD%E9%97%A8&sort=recommend&page_limit=50&page_start=0'},
         'tv_domestic': {'name': '热门国产剧', 'type': 'api', 'url': 'https://movie.douban.com/j/search_subjects?type=tv&tag=%E5%9B%BD%E4%BA%A7%E5%89%A7&sort=recommend&page_limit=50&page_start=0'},
         'tv_american': {'name': '热门美剧', 'type': 'api', 'url': 'https://movie.douban.com/j/search_subjects?type=tv&tag=%E7%BE%8E%E5%89%A7&sort=recommend&page_limit=50&page_start=0'},
@@ -67,13 +153,13 @@ class DoubanRank(_PluginBase):
         'tv_korean': {'name': '热门韩剧', 'type': 'api', 'url': 'https://movie.douban.com/j/search_subjects?type=tv&tag=%E9%9F%A9%E5%89%A7&sort=recommend&page_limit=50&page_start=0'},
         'tv_animation': {'name': '热门动画番剧', 'type': 'api', 'url': 'https://movie.douban.com/j/search_subjects?type=tv&tag=%E6%97%A5%E6%9C%AC%E5%8A%A8%E7%94%BB&sort=recommend&page_limit=50&page_start=0'},
         'tv_documentary': {'name': '热门纪录片', 'type': 'api', 'url': 'https://movie.douban.com/j/search_subjects?type=tv&tag=%E7%BA%AA%E5%BD%95%E7%89%87&sort=recommend&page_limit=50&page_start=0'},
-    }
+    })
     # 综艺
-    _show_ranks_conf = {
+    _show_ranks_conf = MappingProxyType({
         'show_hot': {'name': '热门综艺(综合)', 'type': 'api', 'url': 'https://movie.douban.com/j/search_subjects?type=tv&tag=%E7%BB%BC%E8%89%BA&sort=recommend&page_limit=50&page_start=0'},
         'show_domestic': {'name': '国内综艺', 'type': 'api', 'url': 'https://movie.douban.com/j/search_subjects?type=tv&tag=%E5%9B%BD%E5%86%85%E7%BB%BC%E8%89%BA&sort=recommend&page_limit=50&page_start=0'},
         'show_foreign': {'name': '国外综艺', 'type': 'api', 'url': 'https://movie.douban.com/j/search_subjects?type=tv&tag=%E5%9B%BD%E5%A4%96%E7%BB%BC%E8%89%BA&sort=recommend&page_limit=50&page_start=0'},
-    }
+    })
 
     # -----------------------
     # 配置属性
@@ -87,30 +173,31 @@ class DoubanRank(_PluginBase):
     
     # 电影配置
     _movie_enabled = False
-    _movie_ranks = []
+    _movie_ranks = ()
     _movie_min_vote = 7.0
     _movie_min_year = 0
     _movie_count = 10
     
     # 电视剧配置
     _tv_enabled = False
-    _tv_ranks = []
+    _tv_ranks = ()
     _tv_min_vote = 7.5
     _tv_min_year = 0
     _tv_count = 10
     
     # 综艺配置
     _show_enabled = False
-    _show_ranks = []
+    _show_ranks = ()
     _show_min_vote = 7.0
     _show_min_year = 0
     _show_count = 10
 
     def init_plugin(self, config: dict = None):
-        logger.info("正在初始化豆瓣榜单订阅插件 (v3.1.2)...")
-        self.subscribechain = SubscribeChain()
-        self.downloadchain = DownloadChain()
-        self.mediachain = MediaChain()
+        logger.info("正在初始化豆瓣榜单订阅插件 (v3.2.0)...")
+        # 链路对象无配置相关状态，重复初始化时沿用已有实例
+        self.subscribechain = self.subscribechain or SubscribeChain()
+        self.downloadchain = self.downloadchain or DownloadChain()
+        self.mediachain = self.mediachain or MediaChain()
 
         if config:
             self._enabled = config.get("enabled", False)
@@ -143,20 +230,21 @@ class DoubanRank(_PluginBase):
 
         self.stop_service()
 
-        if self._enabled or self._onlyonce:
-            if self._enabled and self._cron:
-                self._scheduler = BackgroundScheduler(timezone=settings.TZ)
-                self._scheduler.add_job(func=self.refresh_douban, trigger=CronTrigger.from_crontab(self._cron), name="豆瓣榜单订阅")
-                if self._scheduler.get_jobs():
-                    self._scheduler.start()
+        # 所有榜单请求共用一个会话，复用 keep-alive 连接
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+        if self._proxy and settings.PROXY:
+            self._session.proxies.update(settings.PROXY)
 
+        # 周期任务由 get_service 交给框架调度，这里只处理一次性操作
+        if self._enabled or self._onlyonce:
             self.__execute_once_operations()
 
     def __execute_once_operations(self):
         config_updated = False
         
         if self._clear_history:
-            self.save_data('history', [])
+            self.save_data('history', {})
             self._clear_history = False
             config_updated = True
             logger.info("豆瓣榜单订阅：历史记录已清理")
@@ -212,7 +300,7 @@ class DoubanRank(_PluginBase):
 
     def get_service(self) -> List[Dict[str, Any]]:
         if self._enabled and self._cron:
-            return [{"id": "DoubanRank", "name": "豆瓣榜单订阅服务", "trigger": CronTrigger.from_crontab(self._cron), "func": self.refresh_douban, "kwargs": {}}]
+            return [{"id": "DoubanRank", "name": "豆瓣榜单订阅服务", "trigger": _compile_cron(self._cron), "func": self.refresh_douban, "kwargs": {}}]
         return []
 
     def get_form(self) -> Tuple[List[dict], Dict[str, Any]]:
@@ -299,59 +387,86 @@ class DoubanRank(_PluginBase):
         }
 
     def get_page(self) -> List[dict]:
-        historys = self.get_data('history')
+        historys = self.__get_history()
         if not historys:
             return [{'component': 'div', 'text': '暂无数据', 'props': {'class': 'text-center'}}]
         
-        historys = sorted(historys, key=lambda x: x.get('time'), reverse=True)[:50]
-        contents = []
-        for history in historys:
-            title = history.get("title")
-            doubanid = history.get("doubanid")
-            contents.append({
-                'component': 'VCard',
-                'props': {'class': 'mx-auto mb-2', 'width': '100%'},
-                'content': [
-                    {
-                        "component": "VDialogCloseBtn",
-                        "props": {'innerClass': 'absolute top-0 right-0'},
-                        'events': {
-                            'click': {
-                                'api': 'plugin/DoubanRank/delete_history',
-                                'method': 'get',
-                                'params': {'key': f"doubanrank: {title} (DB:{doubanid})", 'apikey': settings.API_TOKEN}
-                            }
-                        },
-                    },
-                    {
-                        'component': 'div',
-                        'props': {'class': 'd-flex justify-space-start flex-nowrap flex-row'},
-                        'content': [
-                            {'component': 'div', 'content': [{'component': 'VImg', 'props': {'src': history.get("poster"), 'height': 120, 'width': 80, 'aspect-ratio': '2/3', 'class': 'object-cover shadow ring-gray-500', 'cover': True}}]},
-                            {'component': 'div', 'content': [
-                                {'component': 'VCardTitle', 'props': {'class': 'ps-1 pe-5 break-words whitespace-break-spaces'}, 'content': [{'component': 'a', 'props': {'href': f"https://movie.douban.com/subject/{doubanid}", 'target': '_blank'}, 'text': title}]},
-                                {'component': 'VCardText', 'props': {'class': 'pa-0 px-2'}, 'text': f'类型：{history.get("type")} | {history.get("year")}'},
-                                {'component': 'VCardText', 'props': {'class': 'pa-0 px-2'}, 'text': f'评分：{history.get("vote")} | {history.get("rank_type")}'},
-                                {'component': 'VCardText', 'props': {'class': 'pa-0 px-2'}, 'text': f'时间：{history.get("time")}'}
-                            ]}
-                        ]
-                    }
-                ]
-            })
+        historys = heapq.nlargest(50, historys.values(), key=lambda x: x.get('ts') or _parse_ts(x.get('time')))
+        contents = [self.__make_card(history, settings.API_TOKEN) for history in historys]
         return [{'component': 'div', 'props': {'class': 'grid gap-3 grid-info-card'}, 'content': contents}]
 
+    @staticmethod
+    def __make_card(history: dict, apikey: str) -> dict:
+        """
+        构建单条历史卡片，仅按条目生成变化的节点，静态属性共用模块常量
+        """
+        title = history.get("title")
+        doubanid = history.get("doubanid")
+        return {
+            'component': 'VCard',
+            'props': _CARD_PROPS,
+            'content': [
+                {
+                    "component": "VDialogCloseBtn",
+                    "props": _CARD_CLOSE_PROPS,
+                    'events': {
+                        'click': {
+                            'api': 'plugin/DoubanRank/delete_history',
+                            'method': 'get',
+                            'params': {'key': f"doubanrank: {title} (DB:{doubanid})", 'apikey': apikey}
+                        }
+                    },
+                },
+                {
+                    'component': 'div',
+                    'props': _CARD_BODY_PROPS,
+                    'content': [
+                        {'component': 'div', 'content': [{'component': 'VImg', 'props': {'src': history.get("poster"), **_CARD_POSTER_PROPS}}]},
+                        {'component': 'div', 'content': [
+                            {'component': 'VCardTitle', 'props': _CARD_TITLE_PROPS, 'content': [{'component': 'a', 'props': {'href': f"https://movie.douban.com/subject/{doubanid}", 'target': '_blank'}, 'text': title}]},
+                            {'component': 'VCardText', 'props': _CARD_TEXT_PROPS, 'text': f'类型：{history.get("type")} | {history.get("year")}'},
+                            {'component': 'VCardText', 'props': _CARD_TEXT_PROPS, 'text': f'评分：{history.get("vote")} | {history.get("rank_type")}'},
+                            {'component': 'VCardText', 'props': _CARD_TEXT_PROPS, 'text': f'时间：{history.get("time")}'}
+                        ]}
+                    ]
+                }
+            ]
+        }
+
     def stop_service(self):
-        pass
+        if self._session:
+            self._session.close()
+            self._session = None
+
+    def __get_history(self) -> Dict[str, dict]:
+        """
+        读取以 unique 为键的历史记录，旧版列表结构在首次读取时转换并保存
+        """
+        history = self.get_data('history') or {}
+        if isinstance(history, list):
+            history = {h.get('unique'): h for h in history if h.get('unique')}
+            self.save_data('history', history)
+        return history
 
     def delete_history(self, key: str, apikey: str):
         if apikey != settings.API_TOKEN:
             return {"success": False, "message": "API密钥错误"}
-        historys = self.get_data('history') or []
-        historys = [h for h in historys if h.get("unique") != key]
-        self.save_data('history', historys)
+        historys = self.__get_history()
+        if historys.pop(key, None) is not None:
+            self.save_data('history', historys)
         return {"success": True, "message": "删除成功"}
 
     def refresh_douban(self):
+        """主任务入口，上一次运行未结束时直接跳过"""
+        if not self._run_lock.acquire(blocking=False):
+            logger.warning("豆瓣榜单订阅任务正在运行，跳过本次执行")
+            return
+        try:
+            self.__refresh_douban()
+        finally:
+            self._run_lock.release()
+
+    def __refresh_douban(self):
         """主任务逻辑"""
         logger.info(f"开始执行豆瓣榜单订阅任务...")
         
@@ -376,70 +491,87 @@ class DoubanRank(_PluginBase):
             logger.info("未启用任何订阅配置")
             return
 
-        added_list = []
-        history = self.get_data('history') or []
-
+        rank_jobs = []
         for task in tasks:
-            config_map = task['config_map']
-            limit = task['limit']
-            
             for rank_key in task['ranks']:
-                rank_conf = config_map.get(rank_key)
-                if not rank_conf: continue
-                
-                logger.info(f"正在获取榜单：{rank_conf['name']}")
-                
+                rank_conf = task['config_map'].get(rank_key)
+                if rank_conf:
+                    rank_jobs.append((task, rank_conf))
+        if not rank_jobs:
+            logger.info("未选择有效的榜单")
+            return
+
+        # 网络抓取并发进行，订阅处理仍按榜单顺序串行
+        rank_data = self.__fetch_ranks([rank_conf for _, rank_conf in rank_jobs])
+
+        added_list = []
+        history = self.__get_history()
+        history_size = len(history)
+        # 同一条目可能出现在多个榜单中，本次运行内复用识别结果
+        reco_cache = {}
+        # 跨运行缓存豆瓣 ID 对应的 TMDB ID，榜单变化不大时免去反查
+        stored_ids = self.get_data('tmdb_ids') or {}
+        now = int(time.time())
+        tmdb_ids = {k: v for k, v in stored_ids.items() if now - v.get('time', 0) < _TMDB_ID_TTL}
+        tmdb_ids_size = len(tmdb_ids)
+        subscribed = self.__get_subscribed()
+
+        try:
+            for task, rank_conf in rank_jobs:
+                limit = task['limit']
+                logger.info(f"正在处理榜单：{rank_conf['name']}")
+
                 try:
-                    items = self.__get_douban_data(rank_conf)
+                    items = rank_data.get(rank_conf['url'])
                     if not items:
                         logger.warning(f"榜单 {rank_conf['name']} 未获取到数据")
                         continue
-                    
+                
                     process_items = items[:limit]
                     logger.info(f"榜单 {rank_conf['name']} 获取到 {len(items)} 条，将处理前 {len(process_items)} 条")
-                    
+                
                     for item in process_items:
                         if self._event.is_set(): return
-                        
-                        title = item.get('title')
-                        douban_id = item.get('id')
+                    
+                        title = item.title
+                        douban_id = item.id
+
+                        # 1. 插件历史去重（最常见的跳过原因，最先判断）
+                        unique_flag = f"doubanrank: {title} (DB:{douban_id})"
+                        if unique_flag in history:
+                            logger.info(f"跳过 {title}: 历史记录中已存在")
+                            continue
+
                         try:
-                            vote = float(item.get('rate') or 0)
+                            vote = float(item.rate or 0)
                         except ValueError:
                             vote = 0.0
-                            
-                        year = item.get('year')
                         
-                        # 1. 评分过滤
+                        year = item.year
+                    
+                        # 2. 评分过滤
                         if task['min_vote'] > 0 and vote < task['min_vote']: 
                             logger.info(f"跳过 {title}: 评分 {vote} 低于 {task['min_vote']}")
                             continue
-                        
-                        # 2. 年份过滤
+                    
+                        # 3. 年份过滤
                         if year and task['min_year'] > 0:
-                            try:
-                                year_int = int(re.findall(r'\d{4}', str(year))[0])
-                                if year_int < task['min_year']: 
-                                    logger.info(f"跳过 {title}: 年份 {year_int} 早于 {task['min_year']}")
-                                    continue
-                            except (ValueError, IndexError): pass
-
-                        # 3. 插件历史去重
-                        unique_flag = f"doubanrank: {title} (DB:{douban_id})"
-                        if any(h.get('unique') == unique_flag for h in history): 
-                            logger.info(f"跳过 {title}: 历史记录中已存在")
-                            continue
-                        
+                            match = _RE_YEAR.search(str(year))
+                            year_int = int(match.group()) if match else 0
+                            if match and year_int < task['min_year']: 
+                                logger.info(f"跳过 {title}: 年份 {year_int} 早于 {task['min_year']}")
+                                continue
+                    
                         # 4. 识别与入库
                         meta = MetaInfo(title)
                         if year: meta.year = str(year)
                         meta.type = MediaType.MOVIE if task['cat'] == '电影' else MediaType.TV
-                        
-                        mediainfo = self.__recognize_media(meta, douban_id)
+                    
+                        mediainfo = self.__recognize_media(meta, douban_id, reco_cache, tmdb_ids)
                         if not mediainfo:
                             logger.warn(f'未识别到媒体信息: {title}')
                             continue
-                        
+                    
                         # 5. 精确年份过滤 (识别后)
                         if task['min_year'] > 0 and mediainfo.year:
                             try:
@@ -449,47 +581,83 @@ class DoubanRank(_PluginBase):
                             except: pass
 
                         # 6. 核心去重
-                        if self.__check_exists(mediainfo, meta): 
+                        if self.__check_exists(mediainfo, meta, subscribed): 
                             logger.info(f"跳过 {title}: 媒体库或订阅列表中已存在")
                             continue
-                        
+                    
                         # 7. 添加订阅
                         if self.__add_subscribe(mediainfo, meta, douban_id, rank_conf['name']):
+                            subscribed.add((mediainfo.tmdb_id, meta.begin_season))
                             added_list.append({'title': title, 'type': rank_conf['name'], 'vote': vote})
-                            
-                            history.append({
+                        
+                            now = datetime.datetime.now()
+                            history[unique_flag] = {
                                 "title": title, "type": mediainfo.type.value, "year": mediainfo.year,
-                                "poster": mediainfo.get_poster_image(), "overview": mediainfo.overview,
+                                "poster": mediainfo.get_poster_image(),
                                 "tmdbid": mediainfo.tmdb_id, "doubanid": douban_id, "vote": vote,
                                 "rank_type": rank_conf['name'],
-                                "time": datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S"), "unique": unique_flag
-                            })
-                            self.save_data('history', history[-500:])
-                        
-                        time.sleep(random.uniform(1, 2))
-                        
+                                "time": now.strftime("%Y-%m-%d %H:%M:%S"), "ts": int(now.timestamp()), "unique": unique_flag
+                            }
+                    
                 except Exception as e:
                     logger.error(f"处理榜单 {rank_conf['name']} 出错: {e}")
+        finally:
+            # 本次运行的新增记录统一写入一次
+            if len(history) > history_size:
+                if len(history) > 500:
+                    # 按插入顺序淘汰最早的记录
+                    for key in list(history)[:len(history) - 500]:
+                        del history[key]
+                self.save_data('history', history)
+            if len(tmdb_ids) != tmdb_ids_size or tmdb_ids_size != len(stored_ids):
+                self.save_data('tmdb_ids', tmdb_ids)
 
         if self._notify and added_list:
             self.__send_notification(added_list)
             
         logger.info(f"所有豆瓣榜单处理完成")
 
-    def __recognize_media(self, meta: MetaInfo, douban_id: str) -> MediaInfo:
+    def __recognize_media(self, meta: MetaInfo, douban_id: str, cache: dict = None, tmdb_ids: dict = None) -> MediaInfo:
+        cache_key = (douban_id, meta.type)
+        if cache is not None and cache_key in cache:
+            return cache[cache_key]
+
+        self._limiter.acquire()
         mediainfo = None
         if douban_id and settings.RECOGNIZE_SOURCE == "themoviedb":
             try:
-                tmdbinfo = self.mediachain.get_tmdbinfo_by_doubanid(doubanid=douban_id, mtype=meta.type)
-                if tmdbinfo:
-                    mediainfo = self.chain.recognize_media(meta=meta, tmdbid=tmdbinfo.get("id"))
+                id_key = f"{douban_id}:{meta.type.value}"
+                mapped = tmdb_ids.get(id_key) if tmdb_ids is not None else None
+                if mapped:
+                    tmdbid = mapped.get('tmdbid')
+                else:
+                    tmdbinfo = self.mediachain.get_tmdbinfo_by_doubanid(doubanid=douban_id, mtype=meta.type)
+                    tmdbid = tmdbinfo.get("id") if tmdbinfo else None
+                    if tmdbid and tmdb_ids is not None:
+                        tmdb_ids[id_key] = {'tmdbid': tmdbid, 'time': int(time.time())}
+                if tmdbid:
+                    mediainfo = self.chain.recognize_media(meta=meta, tmdbid=tmdbid)
             except Exception: pass
         
         if not mediainfo:
             mediainfo = self.chain.recognize_media(meta=meta)
+        if cache is not None:
+            cache[cache_key] = mediainfo
         return mediainfo
 
-    def __check_exists(self, mediainfo: MediaInfo, meta: MetaInfo) -> bool:
+    @staticmethod
+    def __get_subscribed() -> set:
+        """
+        一次性读取现有订阅的 (tmdbid, season)，供本次运行内快速判断
+        """
+        try:
+            return {(sub.tmdbid, sub.season) for sub in SubscribeOper().list() if sub.tmdbid}
+        except Exception as e:
+            logger.warning(f"读取订阅列表失败: {e}")
+            return set()
+
+    def __check_exists(self, mediainfo: MediaInfo, meta: MetaInfo, subscribed: set = None) -> bool:
+        if subscribed and (mediainfo.tmdb_id, meta.begin_season) in subscribed: return True
         exist_flag, _ = self.downloadchain.get_no_exists_info(meta=meta, mediainfo=mediainfo)
         if exist_flag: return True
         if self.subscribechain.exists(mediainfo=mediainfo, meta=meta): return True
@@ -507,7 +675,19 @@ class DoubanRank(_PluginBase):
             logger.error(f"订阅失败: {e}")
             return False
 
-    def __get_douban_data(self, rank_conf) -> List[dict]:
+    def __fetch_ranks(self, rank_confs: List[dict]) -> Dict[str, List[_RankItem]]:
+        """
+        并发抓取榜单数据，按 url 返回，同一地址只请求一次
+        """
+        confs = {conf['url']: conf for conf in rank_confs}
+        results = {}
+        with ThreadPoolExecutor(max_workers=min(len(confs), 8)) as executor:
+            futures = {executor.submit(self.__get_douban_data, conf): url for url, conf in confs.items()}
+            for future in as_completed(futures):
+                results[futures[future]] = future.result()
+        return results
+
+    def __get_douban_data(self, rank_conf) -> List[_RankItem]:
         url = rank_conf['url']
         rtype = rank_conf['type']
         
@@ -516,11 +696,8 @@ class DoubanRank(_PluginBase):
             "Referer": "https://movie.douban.com/"
         }
         
-        req_proxy = settings.PROXY if (self._proxy and settings.PROXY) else None
-        req = RequestUtils(proxies=req_proxy) if req_proxy else RequestUtils()
-            
         try:
-            res = req.get_res(url, headers=headers)
+            res = RequestUtils(session=self._session).get_res(url, headers=headers)
             if not res or res.status_code != 200:
                 logger.error(f"请求豆瓣失败: {url} (Code: {res.status_code if res else 'None'})")
                 return []
@@ -529,36 +706,76 @@ class DoubanRank(_PluginBase):
             
             if rtype == 'api':
                 try:
-                    data = res.json()
-                    subjects = data.get('subjects', [])
-                    for sub in subjects:
-                        results.append({
-                            'title': sub.get('title'),
-                            'rate': sub.get('rate'),
-                            'id': sub.get('id'),
-                            'year': None
-                        })
+                    if _SIMD_PARSER is not None:
+                        with _SIMD_LOCK:
+                            results = self.__parse_subjects(_SIMD_PARSER.parse(res.content))
+                    else:
+                        results = self.__parse_subjects(_json.loads(res.content))
                 except Exception: logger.error("API解析失败")
             
+            elif rtype == 'html' and HTMLParser is not None:
+                results = self.__parse_html(url, res.text)
+
             elif rtype == 'html':
                 html = res.text
-                if 'movie_top250' in url:
-                    pattern = re.compile(r'class="hd">\s*<a href=".*?/subject/(\d+)/".*?<span class="title">([^<]+)</span>.*?<span class="rating_num"[^>]*>([\d\.]+)</span>', re.S)
-                    matches = pattern.findall(html)
-                    for m in matches:
-                        results.append({'id': m[0], 'title': m[1], 'rate': m[2], 'year': None})
+                if 'top250' in url:
+                    pattern = _RE_TOP250
                 elif 'chart' in url:
-                    pattern = re.compile(r'<a class="nbg" href=".*?/subject/(\d+)/"\s*title="([^"]+)".*?<span class="rating_nums">([\d\.]+)</span>', re.S)
-                    matches = pattern.findall(html)
-                    for m in matches:
-                        results.append({'id': m[0], 'title': m[1], 'rate': m[2], 'year': None})
+                    pattern = _RE_CHART
+                else:
+                    pattern = None
+                if pattern:
+                    for m in pattern.finditer(html):
+                        results.append(_RankItem(m.group(1), m.group(2), m.group(3), None))
             
             return results
         except Exception as e:
             logger.error(f"解析数据失败: {e}")
             return []
 
+    @staticmethod
+    def __parse_html(url: str, html: str) -> List[_RankItem]:
+        """
+        解析 Top250 / 排行榜页面，顺带提取年份
+        """
+        def first_year(node):
+            if not node:
+                return None
+            # 只取最后一行，不拆分整段文本
+            match = _RE_YEAR.search(node.text().strip().rpartition('\n')[2])
+            return match.group() if match else None
+
+        tree = HTMLParser(html)
+        results = []
+        if 'top250' in url:
+            for node in tree.css('ol.grid_view li'):
+                link, title = node.css_first('.hd a'), node.css_first('.title')
+                match = _RE_SUBJECT.search(link.attributes.get('href') or '') if link else None
+                if not match or not title:
+                    continue
+                rate = node.css_first('.rating_num')
+                results.append(_RankItem(match.group(1), title.text(strip=True),
+                                         rate.text(strip=True) if rate else None, first_year(node.css_first('.bd p'))))
+        elif 'chart' in url:
+            for node in tree.css('tr.item'):
+                link = node.css_first('a.nbg')
+                match = _RE_SUBJECT.search(link.attributes.get('href') or '') if link else None
+                if not match or not link.attributes.get('title'):
+                    continue
+                rate = node.css_first('.rating_nums')
+                results.append(_RankItem(match.group(1), link.attributes.get('title'),
+                                         rate.text(strip=True) if rate else None, first_year(node.css_first('p.pl'))))
+        return results
+
+    @staticmethod
+    def __parse_subjects(data) -> List[_RankItem]:
+        """
+        只取需要的字段，取出的均为 Python 原生值，不保留对解析文档的引用
+        """
+        return [_RankItem(sub.get('id'), sub.get('title'), sub.get('rate'), None)
+                for sub in data.get('subjects') or []]
+
     def __send_notification(self, items):
         if not items: return
-        text = "\n".join([f"• [{i['type']}] {i['title']} ({i['vote']}分)" for i in items])
+        text = "\n".join(f"• [{i['type']}] {i['title']} ({i['vote']}分)" for i in items)
         self.post_message(mtype=NotificationType.Subscribe, title=f"豆瓣订阅新增 {len(items)} 部", text=text)
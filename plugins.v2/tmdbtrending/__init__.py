@@ -1,33 +1,145 @@
 # 强制打印日志
-print("加载 TmdbTrending 插件模块 (v1.2.4)...")
+print("加载 TmdbTrending 插件模块 (v1.3.0)...")
 
 import datetime
-from threading import Thread
-from typing import Tuple, List, Dict, Any
-
+import heapq
+import json
+import re
+import time
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from threading import Lock, Thread
+from typing import Tuple, List, Dict, Any, Optional
+
+import requests
 from apscheduler.triggers.cron import CronTrigger
+from requests.adapters import HTTPAdapter
 
 from app.chain.download import DownloadChain
 from app.chain.subscribe import SubscribeChain
 from app.core.config import settings
 from app.core.context import MediaInfo
 from app.core.metainfo import MetaInfo
+from app.db.subscribe_oper import SubscribeOper
 from app.log import logger
 from app.plugins import _PluginBase
+from app.schemas.types import MediaType, NotificationType
 from app.utils.http import RequestUtils
 
-# 兼容性导入
+# 可选依赖：orjson 解析更快，缺失时回退标准库
 try:
-    from app.schemas import MediaType, NotificationType
+    import orjson as _json
 except ImportError:
-    from app.schemas.types import MediaType, NotificationType
+    _json = json
+
+# 条件请求缓存中保留的条目字段，其余字段不参与处理
+_RESULT_FIELDS = ('id', 'title', 'name', 'release_date', 'first_air_date', 'vote_average',
+                  'genre_ids', 'origin_country', 'original_language')
+_RE_MAX_AGE = re.compile(r'max-age=(\d+)')
+# 缓存超过 7 天未刷新的地址视为不再使用
+_ETAG_TTL = 7 * 24 * 3600
+# 各榜单来源对应的 TMDB 接口路径，{type} 为 movie / tv
+_TMDB_BASE_URL = "https://api.themoviedb.org/3"
+# TMDB 列表接口固定每页 20 条，每个榜单最多取 5 页
+_PAGE_SIZE = 20
+_MAX_PAGES = 5
+_SOURCE_PATHS = {
+    'discover': "discover/{type}",
+    'now_playing': "movie/now_playing",
+    'airing_today': "tv/airing_today",
+    'on_the_air': "tv/on_the_air",
+    'popular': "{type}/popular",
+    'top_rated': "{type}/top_rated",
+}
+
+# 表单选项，模块加载时构建一次
+_MOVIE_SOURCE_ITEMS = [
+    {'title': '今日趋势 (Trending Day)', 'value': 'trending_day'},
+    {'title': '本周趋势 (Trending Week)', 'value': 'trending_week'},
+    {'title': '正在热映 (Now Playing)', 'value': 'now_playing'},
+    {'title': '热门电影 (Popular)', 'value': 'popular'},
+    {'title': '高分电影 (Top Rated)', 'value': 'top_rated'},
+    {'title': '按分类发现 (Discovery)', 'value': 'discover'},
+]
+
+_TV_SOURCE_ITEMS = [
+    {'title': '今日趋势 (Trending Day)', 'value': 'trending_day'},
+    {'title': '本周趋势 (Trending Week)', 'value': 'trending_week'},
+    {'title': '正在热播 (Airing Today)', 'value': 'airing_today'},
+    {'title': '即将播出 (On The Air)', 'value': 'on_the_air'},
+    {'title': '热门剧集 (Popular)', 'value': 'popular'},
+    {'title': '高分剧集 (Top Rated)', 'value': 'top_rated'},
+    {'title': '按分类发现 (Discovery)', 'value': 'discover'},
+]
+
+# 电影分类
+_MOVIE_GENRE_ITEMS = [
+    {'title': '动作 (Action)', 'value': '28'},
+    {'title': '冒险 (Adventure)', 'value': '12'},
+    {'title': '动画 (Animation)', 'value': '16'},
+    {'title': '喜剧 (Comedy)', 'value': '35'},
+    {'title': '犯罪 (Crime)', 'value': '80'},
+    {'title': '纪录 (Documentary)', 'value': '99'},
+    {'title': '剧情 (Drama)', 'value': '18'},
+    {'title': '家庭 (Family)', 'value': '10751'},
+    {'title': '奇幻 (Fantasy)', 'value': '14'},
+    {'title': '历史 (History)', 'value': '36'},
+    {'title': '恐怖 (Horror)', 'value': '27'},
+    {'title': '音乐 (Music)', 'value': '10402'},
+    {'title': '悬疑 (Mystery)', 'value': '9648'},
+    {'title': '爱情 (Romance)', 'value': '10749'},
+    {'title': '科幻 (Sci-Fi)', 'value': '878'},
+    {'title': '电视电影 (TV Movie)', 'value': '10770'},
+    {'title': '惊悚 (Thriller)', 'value': '53'},
+    {'title': '战争 (War)', 'value': '10752'},
+    {'title': '西部 (Western)', 'value': '37'},
+]
+
+# 电视剧分类
+_TV_GENRE_ITEMS = [
+    {'title': '动作冒险 (Action & Adventure)', 'value': '10759'},
+    {'title': '动画 (Animation)', 'value': '16'},
+    {'title': '喜剧 (Comedy)', 'value': '35'},
+    {'title': '犯罪 (Crime)', 'value': '80'},
+    {'title': '纪录 (Documentary)', 'value': '99'},
+    {'title': '剧情 (Drama)', 'value': '18'},
+    {'title': '家庭 (Family)', 'value': '10751'},
+    {'title': '儿童 (Kids)', 'value': '10762'},
+    {'title': '悬疑 (Mystery)', 'value': '9648'},
+    {'title': '新闻 (News)', 'value': '10763'},
+    {'title': '真人秀 (Reality)', 'value': '10764'},
+    {'title': '科幻奇幻 (Sci-Fi & Fantasy)', 'value': '10765'},
+    {'title': '肥皂剧 (Soap)', 'value': '10766'},
+    {'title': '脱口秀 (Talk)', 'value': '10767'},
+    {'title': '战争政治 (War & Politics)', 'value': '10768'},
+    {'title': '西部 (Western)', 'value': '37'},
+]
+
+_ANIME_WINDOW_ITEMS = [{'title': '今日', 'value': 'day'}, {'title': '本周', 'value': 'week'}]
+
+@lru_cache(maxsize=1024)
+def _parse_ts(time_str: str) -> int:
+    """
+    兼容没有 ts 字段的旧记录，由时间字符串换算时间戳
+    """
+    try:
+        return int(datetime.datetime.strptime(time_str, "%Y-%m-%d %H:%M:%S").timestamp())
+    except (TypeError, ValueError):
+        return 0
+
+@lru_cache(maxsize=32)
+def _compile_cron(expr: str) -> CronTrigger:
+    """
+    解析 cron 表达式，框架多次调用 get_service 时复用同一触发器
+    """
+    return CronTrigger.from_crontab(expr)
 
 class TmdbTrending(_PluginBase):
     # 插件基本信息
     plugin_name = "TMDB趋势订阅"
     plugin_desc = "订阅 TMDB 趋势、热映、热门、高分及指定分类榜单，支持多榜单并发、年份过滤与去重。"
     plugin_icon = "https://www.themoviedb.org/assets/2/v4/logos/v2/blue_square_2-d537fb228cf3ded904ef09b136fe3fec72548ebc1fea3fbbd1ad9e36364db38b.svg"
-    plugin_version = "1.2.4"
+    plugin_version = "1.3.0"
     plugin_author = "MoviePilot-Plugins"
     plugin_config_prefix = "tmdbtrending_"
     plugin_order = 10
@@ -45,19 +157,28 @@ class TmdbTrending(_PluginBase):
     _clear_history = False
     _filter_anime = False # 新增：忽略日番
     _tmdb_api_key = ""
+    # 实际使用的密钥：插件配置优先，留空时取系统配置
+    _api_key = ""
+    # TMDB 条件请求缓存 {地址: {etag, expires, time, results}}
+    _etags: Dict[str, dict] = None
+    # 定时任务与立即运行共用，同一时间只允许一个同步任务
+    _run_lock = Lock()
+    _session = None
+    # 按配置展开的榜单任务
+    _jobs = ()
     
     # 电影配置
     _movie_enabled = False
-    _movie_sources = ["trending_day"]
-    _movie_genres = []
+    _movie_sources = ("trending_day",)
+    _movie_genres = ()
     _movie_min_vote = 7.0
     _movie_min_year = 0
     _movie_count = 10
     
     # 电视剧配置
     _tv_enabled = False
-    _tv_sources = ["trending_week"]
-    _tv_genres = []
+    _tv_sources = ("trending_week",)
+    _tv_genres = ()
     _tv_min_vote = 7.5
     _tv_min_year = 0
     _tv_count = 10
@@ -71,8 +192,9 @@ class TmdbTrending(_PluginBase):
 
     def init_plugin(self, config: dict = None):
         logger.info("正在初始化 TMDB 趋势订阅插件...")
-        self.subscribechain = SubscribeChain()
-        self.downloadchain = DownloadChain()
+        # 链路对象无配置相关状态，重复初始化时沿用已有实例
+        self.subscribechain = self.subscribechain or SubscribeChain()
+        self.downloadchain = self.downloadchain or DownloadChain()
         
         if config:
             self._enabled = config.get("enabled", False)
@@ -106,6 +228,19 @@ class TmdbTrending(_PluginBase):
             self._anime_min_year = int(config.get("anime_min_year", 0))
             self._anime_count = int(config.get("anime_count", 10))
 
+        self._api_key = self._tmdb_api_key or settings.TMDB_API_KEY
+        if self._enabled and not self._api_key:
+            logger.error("TMDB趋势订阅：未配置 TMDB API KEY，定时任务不会启动")
+
+        # 榜单任务只随配置变化，在此展开一次供每次运行复用
+        self._jobs = self.__build_jobs()
+
+        self.stop_service()
+
+        # 所有 TMDB 请求共用一个会话，复用 keep-alive 连接
+        self._session = requests.Session()
+        self._session.mount("https://", HTTPAdapter(pool_connections=4, pool_maxsize=8))
+
         self.__execute_once_operations()
 
     def __update_config(self):
@@ -150,7 +285,7 @@ class TmdbTrending(_PluginBase):
 
         if self._clear_history:
             logger.info("TMDB趋势订阅：正在清除历史记录...")
-            self.save_data('history', [])
+            self.save_data('history', {})
             self._clear_history = False
             config_updated = True
             logger.info("TMDB趋势订阅：历史记录已清除。")
@@ -175,80 +310,42 @@ class TmdbTrending(_PluginBase):
         return []
 
     def get_service(self) -> List[Dict[str, Any]]:
-        if self._enabled and self._cron:
+        if self._enabled and self._cron and self._api_key:
             return [{
                 "id": "TmdbTrending",
                 "name": "TMDB趋势订阅",
-                "trigger": CronTrigger.from_crontab(self._cron),
+                "trigger": _compile_cron(self._cron),
                 "func": self.sync_tmdb_trends,
                 "kwargs": {}
             }]
         return []
 
-    def get_form(self) -> Tuple[List[dict], Dict[str, Any]]:
-        # 数据源选项
-        movie_sources = [
-            {'title': '今日趋势 (Trending Day)', 'value': 'trending_day'},
-            {'title': '本周趋势 (Trending Week)', 'value': 'trending_week'},
-            {'title': '正在热映 (Now Playing)', 'value': 'now_playing'},
-            {'title': '热门电影 (Popular)', 'value': 'popular'},
-            {'title': '高分电影 (Top Rated)', 'value': 'top_rated'},
-            {'title': '按分类发现 (Discovery)', 'value': 'discover'},
-        ]
-        
-        tv_sources = [
-            {'title': '今日趋势 (Trending Day)', 'value': 'trending_day'},
-            {'title': '本周趋势 (Trending Week)', 'value': 'trending_week'},
-            {'title': '正在热播 (Airing Today)', 'value': 'airing_today'},
-            {'title': '即将播出 (On The Air)', 'value': 'on_the_air'},
-            {'title': '热门剧集 (Popular)', 'value': 'popular'},
-            {'title': '高分剧集 (Top Rated)', 'value': 'top_rated'},
-            {'title': '按分类发现 (Discovery)', 'value': 'discover'},
-        ]
-
-        # 电影分类
-        movie_genres_opt = [
-            {'title': '动作 (Action)', 'value': '28'},
-            {'title': '冒险 (Adventure)', 'value': '12'},
-            {'title': '动画 (Animation)', 'value': '16'},
-            {'title': '喜剧 (Comedy)', 'value': '35'},
-            {'title': '犯罪 (Crime)', 'value': '80'},
-            {'title': '纪录 (Documentary)', 'value': '99'},
-            {'title': '剧情 (Drama)', 'value': '18'},
-            {'title': '家庭 (Family)', 'value': '10751'},
-            {'title': '奇幻 (Fantasy)', 'value': '14'},
-            {'title': '历史 (History)', 'value': '36'},
-            {'title': '恐怖 (Horror)', 'value': '27'},
-            {'title': '音乐 (Music)', 'value': '10402'},
-            {'title': '悬疑 (Mystery)', 'value': '9648'},
-            {'title': '爱情 (Romance)', 'value': '10749'},
-            {'title': '科幻 (Sci-Fi)', 'value': '878'},
-            {'title': '电视电影 (TV Movie)', 'value': '10770'},
-            {'title': '惊悚 (Thriller)', 'value': '53'},
-            {'title': '战争 (War)', 'value': '10752'},
-            {'title': '西部 (Western)', 'value': '37'},
-        ]
-
-        # 电视剧分类
-        tv_genres_opt = [
-            {'title': '动作冒险 (Action & Adventure)', 'value': '10759'},
-            {'title': '动画 (Animation)', 'value': '16'},
-            {'title': '喜剧 (Comedy)', 'value': '35'},
-            {'title': '犯罪 (Crime)', 'value': '80'},
-            {'title': '纪录 (Documentary)', 'value': '99'},
-            {'title': '剧情 (Drama)', 'value': '18'},
-            {'title': '家庭 (Family)', 'value': '10751'},
-            {'title': '儿童 (Kids)', 'value': '10762'},
-            {'title': '悬疑 (Mystery)', 'value': '9648'},
-            {'title': '新闻 (News)', 'value': '10763'},
-            {'title': '真人秀 (Reality)', 'value': '10764'},
-            {'title': '科幻奇幻 (Sci-Fi & Fantasy)', 'value': '10765'},
-            {'title': '肥皂剧 (Soap)', 'value': '10766'},
-            {'title': '脱口秀 (Talk)', 'value': '10767'},
-            {'title': '战争政治 (War & Politics)', 'value': '10768'},
-            {'title': '西部 (Western)', 'value': '37'},
-        ]
+    @staticmethod
+    def __category_row(prefix: str, selector: dict) -> dict:
+        """
+        电影/电视剧/动漫共用的配置行：启用、来源选择、最低分、最低年份、TopN
+        """
+        return {
+            'component': 'VRow',
+            'content': [
+                {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VSwitch', 'props': {'model': f'{prefix}_enabled', 'label': '启用'}}]},
+                {'component': 'VCol', 'props': {'cols': 12, 'md': 4}, 'content': [{'component': 'VSelect', 'props': selector}]},
+                {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VTextField', 'props': {'model': f'{prefix}_min_vote', 'label': '最低分', 'type': 'number'}}]},
+                {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VTextField', 'props': {'model': f'{prefix}_min_year', 'label': '最低年份', 'placeholder': '0为不限', 'type': 'number'}}]},
+                {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VTextField', 'props': {'model': f'{prefix}_count', 'label': '检查TopN', 'type': 'number', 'placeholder': '前多少名'}}]}
+            ]
+        }
+
+    @staticmethod
+    def __genre_row(prefix: str, items: list) -> dict:
+        return {
+            'component': 'VRow',
+            'content': [
+                {'component': 'VCol', 'props': {'cols': 12, 'md': 12}, 'content': [{'component': 'VSelect', 'props': {'model': f'{prefix}_genres', 'label': '指定分类 (仅Discovery来源生效, 可多选)', 'multiple': True, 'chips': True, 'clearable': True, 'items': items}}]}
+            ]
+        }
 
+    def get_form(self) -> Tuple[List[dict], Dict[str, Any]]:
         return [
             {
                 'component': 'VForm',
@@ -291,52 +388,15 @@ class TmdbTrending(_PluginBase):
                     },
                     # 电影配置
                     {'component': 'VAlert', 'props': {'type': 'info', 'text': '电影订阅配置', 'variant': 'tonal', 'class': 'mt-4'}},
-                    {
-                        'component': 'VRow',
-                        'content': [
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VSwitch', 'props': {'model': 'movie_enabled', 'label': '启用'}}]},
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 4}, 'content': [{'component': 'VSelect', 'props': {'model': 'movie_sources', 'label': '榜单来源(可多选)', 'multiple': True, 'chips': True, 'items': movie_sources}}]},
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VTextField', 'props': {'model': 'movie_min_vote', 'label': '最低分', 'type': 'number'}}]},
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VTextField', 'props': {'model': 'movie_min_year', 'label': '最低年份', 'placeholder': '0为不限', 'type': 'number'}}]},
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VTextField', 'props': {'model': 'movie_count', 'label': '检查TopN', 'type': 'number', 'placeholder': '前多少名'}}]}
-                        ]
-                    },
-                    {
-                        'component': 'VRow',
-                        'content': [
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 12}, 'content': [{'component': 'VSelect', 'props': {'model': 'movie_genres', 'label': '指定分类 (仅Discovery来源生效, 可多选)', 'multiple': True, 'chips': True, 'clearable': True, 'items': movie_genres_opt}}]}
-                        ]
-                    },
+                    self.__category_row('movie', {'model': 'movie_sources', 'label': '榜单来源(可多选)', 'multiple': True, 'chips': True, 'items': _MOVIE_SOURCE_ITEMS}),
+                    self.__genre_row('movie', _MOVIE_GENRE_ITEMS),
                     # 电视剧配置
                     {'component': 'VAlert', 'props': {'type': 'success', 'text': '电视剧订阅配置', 'variant': 'tonal', 'class': 'mt-4'}},
-                    {
-                        'component': 'VRow',
-                        'content': [
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VSwitch', 'props': {'model': 'tv_enabled', 'label': '启用'}}]},
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 4}, 'content': [{'component': 'VSelect', 'props': {'model': 'tv_sources', 'label': '榜单来源(可多选)', 'multiple': True, 'chips': True, 'items': tv_sources}}]},
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VTextField', 'props': {'model': 'tv_min_vote', 'label': '最低分', 'type': 'number'}}]},
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VTextField', 'props': {'model': 'tv_min_year', 'label': '最低年份', 'placeholder': '0为不限', 'type': 'number'}}]},
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VTextField', 'props': {'model': 'tv_count', 'label': '检查TopN', 'type': 'number', 'placeholder': '前多少名'}}]}
-                        ]
-                    },
-                    {
-                        'component': 'VRow',
-                        'content': [
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 12}, 'content': [{'component': 'VSelect', 'props': {'model': 'tv_genres', 'label': '指定分类 (仅Discovery来源生效, 可多选)', 'multiple': True, 'chips': True, 'clearable': True, 'items': tv_genres_opt}}]}
-                        ]
-                    },
+                    self.__category_row('tv', {'model': 'tv_sources', 'label': '榜单来源(可多选)', 'multiple': True, 'chips': True, 'items': _TV_SOURCE_ITEMS}),
+                    self.__genre_row('tv', _TV_GENRE_ITEMS),
                     # 动漫配置
                     {'component': 'VAlert', 'props': {'type': 'warning', 'text': '动漫订阅配置 (独立预设：自动筛选日漫+动画)', 'variant': 'tonal', 'class': 'mt-4'}},
-                    {
-                        'component': 'VRow',
-                        'content': [
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VSwitch', 'props': {'model': 'anime_enabled', 'label': '启用'}}]},
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 4}, 'content': [{'component': 'VSelect', 'props': {'model': 'anime_window', 'label': '趋势周期', 'items': [{'title': '今日', 'value': 'day'}, {'title': '本周', 'value': 'week'}]}}]},
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VTextField', 'props': {'model': 'anime_min_vote', 'label': '最低分', 'type': 'number'}}]},
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VTextField', 'props': {'model': 'anime_min_year', 'label': '最低年份', 'placeholder': '0为不限', 'type': 'number'}}]},
-                            {'component': 'VCol', 'props': {'cols': 12, 'md': 2}, 'content': [{'component': 'VTextField', 'props': {'model': 'anime_count', 'label': '检查TopN', 'type': 'number', 'placeholder': '前多少名'}}]}
-                        ]
-                    }
+                    self.__category_row('anime', {'model': 'anime_window', 'label': '趋势周期', 'items': _ANIME_WINDOW_ITEMS})
                 ]
             }
         ], {
@@ -370,11 +430,11 @@ class TmdbTrending(_PluginBase):
         }
 
     def get_page(self) -> List[dict]:
-        history = self.get_data('history') or []
+        history = self.__get_history()
         if not history:
             return [{'component': 'div', 'text': '暂无订阅历史', 'props': {'class': 'text-center mt-4'}}]
         
-        history = sorted(history, key=lambda x: x.get('time'), reverse=True)[:50]
+        history = heapq.nlargest(50, history.values(), key=lambda x: x.get('ts') or _parse_ts(x.get('time')))
         contents = []
         for item in history:
             tmdb_link = f"https://www.themoviedb.org/{'movie' if item.get('type')=='电影' else 'tv'}/{item.get('tmdb_id')}"
@@ -402,200 +462,258 @@ class TmdbTrending(_PluginBase):
             })
         return [{'component': 'div', 'props': {'class': 'grid gap-3 grid-info-card'}, 'content': contents}]
 
+    def __get_history(self) -> Dict[str, dict]:
+        """
+        读取以 unique_key 为键的历史记录，旧版列表结构在首次读取时转换并保存
+        """
+        history = self.get_data('history') or {}
+        if isinstance(history, list):
+            history = {h.get('unique_key'): h for h in history if h.get('unique_key')}
+            self.save_data('history', history)
+        return history
+
     def stop_service(self):
-        pass
+        if self._session:
+            self._session.close()
+            self._session = None
 
     def sync_tmdb_trends(self):
+        """任务入口，上一次运行未结束时直接跳过"""
+        if not self._run_lock.acquire(blocking=False):
+            logger.warning("TMDB 榜单订阅任务正在运行，跳过本次执行")
+            return
+        try:
+            self.__sync_tmdb_trends()
+        finally:
+            self._run_lock.release()
+
+    def __sync_tmdb_trends(self):
         """核心业务逻辑"""
         logger.info("开始执行 TMDB 榜单订阅任务...")
-        added_list = []
-        
-        # 1. 处理电影
-        if self._movie_enabled:
-            sources = self._movie_sources if isinstance(self._movie_sources, list) else [self._movie_sources]
-            genres = self._movie_genres if isinstance(self._movie_genres, list) else []
+        jobs = self._jobs
+        if not jobs:
+            logger.info("未启用任何订阅配置")
+            return
+        if not self._api_key:
+            logger.error("未配置 TMDB API KEY")
+            return
 
-            for src in sources:
-                if src == 'discover':
-                    target_genres = genres if genres else [""] 
-                    for genre_id in target_genres:
-                        added_list.extend(self.__fetch_and_process(
-                            media_type=MediaType.MOVIE,
-                            source=src,
-                            genre_id=genre_id,
-                            min_vote=self._movie_min_vote,
-                            min_year=self._movie_min_year,
-                            limit=self._movie_count,
-                            category_label="电影"
-                        ))
-                else:
-                    added_list.extend(self.__fetch_and_process(
-                        media_type=MediaType.MOVIE,
-                        source=src,
-                        genre_id="",
-                        min_vote=self._movie_min_vote,
-                        min_year=self._movie_min_year,
-                        limit=self._movie_count,
-                        category_label="电影"
-                    ))
+        added_list = []
+        history = self.__get_history()
+        history_size = len(history)
+        subscribed = self.__get_subscribed()
+        # 同一条目可能出现在多个榜单中，本次运行内只检查一次，归属首个命中的榜单
+        checked = set()
+        self._etags = self.get_data('etags') or {}
         
-        # 2. 处理电视剧
-        if self._tv_enabled:
-            sources = self._tv_sources if isinstance(self._tv_sources, list) else [self._tv_sources]
-            genres = self._tv_genres if isinstance(self._tv_genres, list) else []
-
-            for src in sources:
-                if src == 'discover':
-                    target_genres = genres if genres else [""]
-                    for genre_id in target_genres:
-                        added_list.extend(self.__fetch_and_process(
-                            media_type=MediaType.TV,
-                            source=src,
-                            genre_id=genre_id,
-                            min_vote=self._tv_min_vote,
-                            min_year=self._tv_min_year,
-                            limit=self._tv_count,
-                            category_label="电视剧"
-                        ))
-                else:
-                    added_list.extend(self.__fetch_and_process(
-                        media_type=MediaType.TV,
-                        source=src,
-                        genre_id="",
-                        min_vote=self._tv_min_vote,
-                        min_year=self._tv_min_year,
-                        limit=self._tv_count,
-                        category_label="电视剧"
-                    ))
-            
-        # 3. 处理动漫
-        if self._anime_enabled:
-            source = f"trending_{self._anime_window}"
-            added_list.extend(self.__fetch_and_process(
-                media_type=MediaType.TV,
-                source=source,
-                genre_id="", 
-                min_vote=self._anime_min_vote,
-                min_year=self._anime_min_year,
-                limit=self._anime_count,
-                category_label="动漫",
-                is_anime_logic=True
-            ))
+        try:
+            # 各榜单并发请求 TMDB，订阅处理仍按榜单顺序在当前线程串行
+            with ThreadPoolExecutor(max_workers=min(8, len(jobs))) as executor:
+                futures = [executor.submit(self.__fetch_items, job) for job in jobs]
+                for job, future in zip(jobs, futures):
+                    added_list.extend(self.__process_items(job, future.result(), history, subscribed, checked))
+        finally:
+            # 本次运行的新增记录统一写入一次
+            if len(history) > history_size:
+                if len(history) > 500:
+                    # 字典保持插入顺序，超出上限时丢弃最早的记录
+                    for key in list(history)[:len(history) - 500]:
+                        history.pop(key)
+                self.save_data('history', history)
+            now = int(time.time())
+            self.save_data('etags', {k: v for k, v in self._etags.items() if now - v.get('time', 0) < _ETAG_TTL})
 
         if self._notify and added_list:
             self.__send_notification(added_list)
         
         logger.info("TMDB 榜单订阅任务完成。")
 
-    def __fetch_and_process(self, media_type: MediaType, source: str, genre_id: str, min_vote: float, min_year: int, limit: int, category_label: str, is_anime_logic: bool = False) -> List[dict]:
+    def __build_jobs(self) -> List[dict]:
         """
-        通用获取和处理逻辑
+        按配置展开需要抓取的榜单
         """
-        api_key = self._tmdb_api_key or settings.TMDB_API_KEY
-        if not api_key:
-            logger.error("未配置 TMDB API KEY")
-            return []
+        jobs = []
+        categories = (
+            (self._movie_enabled, MediaType.MOVIE, self._movie_sources, self._movie_genres,
+             self._movie_min_vote, self._movie_min_year, self._movie_count, "电影"),
+            (self._tv_enabled, MediaType.TV, self._tv_sources, self._tv_genres,
+             self._tv_min_vote, self._tv_min_year, self._tv_count, "电视剧"),
+        )
+        # 1. 电影 / 2. 电视剧
+        for enabled, media_type, sources, genres, min_vote, min_year, limit, label in categories:
+            if not enabled:
+                continue
+            sources = sources if isinstance(sources, (list, tuple)) else [sources]
+            genres = genres if isinstance(genres, (list, tuple)) else []
+            for src in sources:
+                target_genres = (genres or [""]) if src == 'discover' else [""]
+                for genre_id in target_genres:
+                    url = self.__build_url(media_type, src, genre_id)
+                    if not url:
+                        continue
+                    jobs.append({
+                        'media_type': media_type, 'source': src, 'genre_id': genre_id, 'url': url,
+                        'min_vote': min_vote, 'min_year': min_year, 'limit': limit,
+                        'category_label': label, 'is_anime_logic': False
+                    })
+        # 3. 动漫
+        if self._anime_enabled:
+            source = f"trending_{self._anime_window}"
+            jobs.append({
+                'media_type': MediaType.TV, 'source': source, 'genre_id': "",
+                'url': self.__build_url(MediaType.TV, source, ""),
+                'min_vote': self._anime_min_vote, 'min_year': self._anime_min_year, 'limit': self._anime_count,
+                'category_label': "动漫", 'is_anime_logic': True
+            })
+        return jobs
 
-        # 构建 URL
-        base_url = "https://api.themoviedb.org/3"
+    @staticmethod
+    def __build_url(media_type: MediaType, source: str, genre_id: str) -> Optional[str]:
+        """
+        生成榜单接口地址（不含分页和密钥），未知来源返回 None
+        """
         type_str = "tv" if media_type == MediaType.TV else "movie"
-        url = ""
-        params = f"api_key={api_key}&language=zh-CN"
+        if source.startswith('trending_'):
+            path = f"trending/{type_str}/{source.split('_')[1]}"
+        elif source in _SOURCE_PATHS:
+            path = _SOURCE_PATHS[source].format(type=type_str)
+        else:
+            return None
 
+        url = f"{_TMDB_BASE_URL}/{path}?language=zh-CN"
         if source == 'discover':
-            url = f"{base_url}/discover/{type_str}?{params}&sort_by=popularity.desc"
+            url += "&sort_by=popularity.desc&include_adult=false"
             if genre_id:
                 url += f"&with_genres={genre_id}"
-        elif source.startswith('trending_'):
-            window = source.split('_')[1] 
-            url = f"{base_url}/trending/{type_str}/{window}?{params}"
-        elif source == 'now_playing':
-            url = f"{base_url}/movie/now_playing?{params}"
-        elif source == 'airing_today':
-            url = f"{base_url}/tv/airing_today?{params}"
-        elif source == 'on_the_air':
-            url = f"{base_url}/tv/on_the_air?{params}"
-        elif source == 'popular':
-            url = f"{base_url}/{type_str}/popular?{params}"
-        elif source == 'top_rated':
-            url = f"{base_url}/{type_str}/top_rated?{params}"
-        else:
-            return []
-
-        results = []
-        page = 1
-        total_scanned = 0
+        return url
 
-        while total_scanned < limit and page <= 5:
+    def __fetch_items(self, job: dict) -> List[dict]:
+        """
+        获取榜单前 limit 条数据，仅做网络请求，可在线程池中执行
+        """
+        api_key = self._api_key
+        url = job['url']
+        limit = job['limit']
+        items = []
+        # 按所需条数计算页数，不多请求
+        for page in range(1, min((limit + _PAGE_SIZE - 1) // _PAGE_SIZE, _MAX_PAGES) + 1):
             try:
-                req_url = f"{url}&page={page}"
-                response = RequestUtils().get_res(req_url)
-                if not response: break
-                
-                data = response.json()
-                items = data.get('results', [])
-                if not items: break
-                
-                for item in items:
-                    if total_scanned >= limit: break
-                    total_scanned += 1
-                    
-                    if item.get('vote_average', 0) < min_vote: continue
-                    
-                    tmdb_id = item.get('id')
-                    title = item.get('title') if media_type == MediaType.MOVIE else item.get('name')
-                    date = item.get('release_date') if media_type == MediaType.MOVIE else item.get('first_air_date')
-                    year = date[:4] if date else ""
-
-                    if min_year > 0:
-                        if not year: continue 
-                        try:
-                            if int(year) < min_year: continue
-                        except ValueError: continue
-
-                    # 日番判断逻辑
-                    genre_ids = item.get('genre_ids', [])
-                    origin_country = item.get('origin_country', [])
-                    lang = item.get('original_language', '')
-                    # 判定标准：分类含动画(16) 且 (产地JP 或 语言ja)
-                    is_jp_anime = 16 in genre_ids and ('JP' in origin_country or lang == 'ja')
-
-                    if is_anime_logic:
-                        # 动漫模式：只取日番
-                        if not is_jp_anime: continue
-                    else:
-                        # 普通模式：如果开启了忽略日番，则过滤
-                        if self._filter_anime and is_jp_anime:
-                            logger.info(f"跳过 {title}: 检测为日番且已开启忽略")
-                            continue
-                    
-                    unique_key = f"{category_label}:{tmdb_id}"
-                    if self.__is_processed(unique_key): continue
-                    
-                    if self.__add_subscribe(title, year, media_type, tmdb_id, category_label):
-                        display_source = source
-                        if source == 'discover' and genre_id:
-                            display_source = f"discover(genre:{genre_id})"
-
-                        res_item = {
-                            'title': title, 
-                            'type': category_label, 
-                            'vote': item.get('vote_average'), 
-                            'tmdb_id': tmdb_id, 
-                            'year': year,
-                            'source_type': display_source
-                        }
-                        results.append(res_item)
-                        self.__save_history(title, category_label, tmdb_id, item.get('vote_average'), unique_key, year, display_source)
-                
-                page += 1
+                page_items = self.__get_tmdb_page(f"{url}&page={page}", api_key)
             except Exception as e:
                 logger.error(f"TMDB 请求失败: {e}")
                 break
+            items.extend(page_items)
+            # 不足一页说明已到末页
+            if len(page_items) < _PAGE_SIZE: break
+        return items[:limit]
+
+    def __process_items(self, job: dict, items: List[dict], history: Dict[str, dict], subscribed: Optional[set], checked: set) -> List[dict]:
+        """
+        过滤并订阅榜单条目
+        """
+        media_type, source, genre_id = job['media_type'], job['source'], job['genre_id']
+        min_vote, min_year, category_label = job['min_vote'], job['min_year'], job['category_label']
+        results = []
+
+        try:
+            for item in items:
+                tmdb_id = item.get('id')
+                # 先做去重判断，已处理或已订阅的条目不再参与后续过滤
+                unique_key = f"{category_label}:{tmdb_id}"
+                if unique_key in history: continue
+                if subscribed is not None and (tmdb_id, media_type.value) in subscribed: continue
+
+                if item.get('vote_average', 0) < min_vote: continue
+                
+                title = item.get('title') if media_type == MediaType.MOVIE else item.get('name')
+                date = item.get('release_date') if media_type == MediaType.MOVIE else item.get('first_air_date')
+                year = date[:4] if date else ""
+
+                if min_year > 0:
+                    if not year: continue 
+                    try:
+                        if int(year) < min_year: continue
+                    except ValueError: continue
+
+                # 日番判断逻辑
+                genre_ids = item.get('genre_ids', [])
+                origin_country = item.get('origin_country', [])
+                lang = item.get('original_language', '')
+                # 判定标准：分类含动画(16) 且 (产地JP 或 语言ja)
+                is_jp_anime = 16 in genre_ids and ('JP' in origin_country or lang == 'ja')
+
+                if job['is_anime_logic']:
+                    # 动漫模式：只取日番
+                    if not is_jp_anime: continue
+                else:
+                    # 普通模式：如果开启了忽略日番，则过滤
+                    if self._filter_anime and is_jp_anime:
+                        logger.info(f"跳过 {title}: 检测为日番且已开启忽略")
+                        continue
+
+                if (media_type, tmdb_id) in checked: continue
+                checked.add((media_type, tmdb_id))
+                
+                if self.__add_subscribe(title, year, media_type, tmdb_id, category_label, subscribed):
+                    display_source = source
+                    if source == 'discover' and genre_id:
+                        display_source = f"discover(genre:{genre_id})"
+
+                    res_item = {
+                        'title': title, 
+                        'type': category_label, 
+                        'vote': item.get('vote_average'), 
+                        'tmdb_id': tmdb_id, 
+                        'year': year,
+                        'source_type': display_source
+                    }
+                    results.append(res_item)
+                    self.__save_history(history, title, category_label, tmdb_id, item.get('vote_average'), unique_key, year, display_source)
+        except Exception as e:
+            logger.error(f"处理 TMDB 榜单 {source} 出错: {e}")
         
         return results
 
-    def __add_subscribe(self, title, year, mtype, tmdb_id, category_name):
+    def __get_tmdb_page(self, url: str, api_key: str) -> List[dict]:
+        """
+        获取 TMDB 单页结果：max-age 内直接复用缓存，过期后带 If-None-Match 请求，304 时复用缓存
+        """
+        now = int(time.time())
+        cached = self._etags.get(url)
+        if cached and cached.get('expires', 0) > now:
+            return cached.get('results') or []
+
+        headers = {"User-Agent": settings.USER_AGENT}
+        if cached and cached.get('etag'):
+            headers["If-None-Match"] = cached['etag']
+        response = RequestUtils(session=self._session).get_res(f"{url}&api_key={api_key}", headers=headers)
+        if not response:
+            return []
+
+        match = _RE_MAX_AGE.search(response.headers.get('Cache-Control') or '')
+        expires = now + int(match.group(1)) if match else 0
+        if response.status_code == 304 and cached:
+            cached.update({'expires': expires, 'time': now})
+            return cached.get('results') or []
+
+        results = [{k: item[k] for k in _RESULT_FIELDS if k in item} for item in _json.loads(response.content).get('results', [])]
+        etag = response.headers.get('ETag')
+        if etag or expires:
+            self._etags[url] = {'etag': etag, 'expires': expires, 'time': now, 'results': results}
+        return results
+
+    @staticmethod
+    def __get_subscribed() -> Optional[set]:
+        """
+        一次性读取现有订阅的 (tmdbid, 类型)，读取失败时返回 None 以逐条查询
+        """
+        try:
+            return {(sub.tmdbid, sub.type) for sub in SubscribeOper().list() if sub.tmdbid}
+        except Exception as e:
+            logger.warning(f"读取订阅列表失败: {e}")
+            return None
+
+    def __add_subscribe(self, title, year, mtype, tmdb_id, category_name, subscribed: set = None):
         try:
             meta = MetaInfo(title)
             meta.year = year
@@ -605,7 +723,7 @@ class TmdbTrending(_PluginBase):
             mediainfo.type = mtype
             mediainfo.tmdb_id = int(tmdb_id)
             
-            if self.subscribechain.exists(mediainfo=mediainfo, meta=meta):
+            if subscribed is None and self.subscribechain.exists(mediainfo=mediainfo, meta=meta):
                 return False
             
             exist_flag, _ = self.downloadchain.get_no_exists_info(meta=meta, mediainfo=mediainfo)
@@ -614,19 +732,21 @@ class TmdbTrending(_PluginBase):
                 return False
 
             self.subscribechain.add(title=title, year=year, mtype=mtype, tmdbid=int(tmdb_id), season=None, username="TMDB趋势插件")
+            if subscribed is not None:
+                subscribed.add((int(tmdb_id), mtype.value))
             logger.info(f"[{category_name}] 订阅成功: {title}")
             return True
         except Exception as e:
             logger.error(f"订阅失败: {e}")
             return False
 
-    def __is_processed(self, unique_key):
-        history = self.get_data('history') or []
-        return any(h.get('unique_key') == unique_key for h in history)
-
-    def __save_history(self, title, category, tmdb_id, vote, unique_key, year, source):
-        history = self.get_data('history') or []
-        history.append({
+    @staticmethod
+    def __save_history(history, title, category, tmdb_id, vote, unique_key, year, source):
+        """
+        写入本次运行的历史字典，由 sync_tmdb_trends 统一保存
+        """
+        now = datetime.datetime.now()
+        history[unique_key] = {
             'title': title, 
             'type': category, 
             'tmdb_id': tmdb_id, 
@@ -634,11 +754,11 @@ class TmdbTrending(_PluginBase):
             'unique_key': unique_key, 
             'year': year, 
             'source_type': source,
-            'time': datetime.datetime.now().strftime("%Y-%m-%d %H:%M:%S")
-        })
-        self.save_data('history', history[-500:])
+            'time': now.strftime("%Y-%m-%d %H:%M:%S"),
+            'ts': int(now.timestamp())
+        }
 
     def __send_notification(self, items):
         if not items: return
-        text = "\n".join([f"• [{i['type']}] {i['title']} ({i['year']} | {i['vote']}分)" for i in items])
+        text = "\n".join(f"• [{i['type']}] {i['title']} ({i['year']} | {i['vote']}分)" for i in items)
         self.post_message(mtype=NotificationType.Subscribe, title=f"TMDB 订阅新增 {len(items)} 部", text=text)